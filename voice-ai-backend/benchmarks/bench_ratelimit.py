@@ -0,0 +1,47 @@
+"""Measure the per-message overhead of the /voice ingest limiter.
+
+Run from the backend folder:
+
+    python benchmarks/bench_ratelimit.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ratelimit import RateLimits  # noqa: E402
+
+ITERATIONS = 1_000_000
+# 20 ms of 16 kHz PCM16 mono, the smallest chunk the frontend is advised to send
+AUDIO_FRAME_BYTES = 640
+
+
+def main():
+    # Limits high enough that every check takes the full accept path
+    limits = RateLimits(
+        audio_bytes_per_second=1e12,
+        messages_per_second=1e9,
+        ip_audio_bytes_per_second=1e12,
+        ip_messages_per_second=1e9,
+        max_audio_frame_bytes=32000,
+        max_text_payload_bytes=4096,
+    )
+    limiter = limits.connect("127.0.0.1")
+
+    cases = {
+        "baseline (len only)": lambda: len(b"") + AUDIO_FRAME_BYTES,
+        "check_audio accepted": lambda: limiter.check_audio(AUDIO_FRAME_BYTES),
+        "check_audio oversized": lambda: limiter.check_audio(64000),
+        "check_audio odd length": lambda: limiter.check_audio(641),
+        "check_text accepted": lambda: limiter.check_text(120),
+    }
+    for label, func in cases.items():
+        seconds = timeit.timeit(func, number=ITERATIONS)
+        print(f"{label:<26} {seconds / ITERATIONS * 1e9:8.1f} ns/msg")
+
+    limits.disconnect(limiter)
+
+
+if __name__ == "__main__":
+    main()
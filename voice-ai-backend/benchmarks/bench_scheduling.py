@@ -0,0 +1,317 @@
+"""Benchmark the scheduling layer (tools.py and mock_db) at synthetic hospital scale.
+
+Each scenario replaces the mock roster and booking history with a seeded
+synthetic one, then times every entry in ``tools.TOOL_FUNCTIONS`` through
+``utils.handle_tool_call`` alongside the hot ``mock_db`` helpers and
+``create_system_prompt``. Bookings are spread over one patient per ten
+appointments, so the largest default scenario is 1M appointments across 100k
+patients. Run from the backend folder:
+
+    python benchmarks/bench_scheduling.py --output results.json
+    python benchmarks/bench_scheduling.py --compare results.json
+
+With ``--compare`` the run exits non-zero when any benchmark's median is
+slower than the baseline by more than ``--threshold``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mock_db  # noqa: E402
+from tools import TOOL_FUNCTIONS  # noqa: E402
+from utils import create_system_prompt, handle_tool_call  # noqa: E402
+
+DEFAULT_SCENARIOS = "10:1000,100:10000,1000:100000,5000:1000000"
+SPECIALTIES = [
+    "Cardiology", "Dermatology", "Orthopedics", "Pediatrics", "Neurology",
+    "Ophthalmology", "General Surgery", "ENT", "Oncology", "Psychiatry",
+]
+FIRST_DAY = date(2025, 11, 9)
+DAYS = 14
+START_HOUR = 8
+END_HOUR = 16
+PATIENTS_PER_APPOINTMENT = 0.1
+
+
+def parse_scenarios(spec):
+    scenarios = []
+    for item in spec.split(","):
+        doctors, appointments = item.split(":")
+        scenarios.append((int(doctors), int(appointments)))
+    return scenarios
+
+
+def build_dataset(doctor_count, appointment_count, seed):
+    """Replace the mock roster and bookings in place with synthetic data"""
+    rng = random.Random(seed)
+    days = [(FIRST_DAY + timedelta(days=i)).isoformat() for i in range(DAYS)]
+
+    doctors = {}
+    for i in range(doctor_count):
+        doctor_id = f"dr_synthetic_{i:05d}"
+        slots = []
+        for day in days:
+            slots += mock_db._slots_for_day(day, START_HOUR, END_HOUR)
+        doctors[doctor_id] = {
+            "doctor_id": doctor_id,
+            "name": f"Dr. Synthetic{i:05d} {rng.choice(SPECIALTIES)}",
+            "specialty": SPECIALTIES[i % len(SPECIALTIES)],
+            "available_slots": slots,
+        }
+
+    mock_db.DOCTORS.clear()
+    mock_db.DOCTORS.update(doctors)
+    mock_db.clear_appointments()
+
+    slots_per_doctor = len(days) * 2 * (END_HOUR - START_HOUR + 1)
+    capacity = doctor_count * slots_per_doctor
+    if appointment_count > capacity:
+        raise ValueError(
+            f"{appointment_count} appointments exceed {capacity} slots for "
+            f"{doctor_count} doctors"
+        )
+
+    patient_count = max(1, int(appointment_count * PATIENTS_PER_APPOINTMENT))
+    doctor_list = list(doctors.values())
+    for index in rng.sample(range(capacity), appointment_count):
+        doctor = doctor_list[index // slots_per_doctor]
+        slot = doctor["available_slots"][index % slots_per_doctor]
+        mock_db.book_appointment_in_db(
+            doctor["doctor_id"],
+            doctor["name"],
+            slot["date"],
+            slot["time"],
+            f"Patient {rng.randrange(patient_count):06d}",
+        )
+    return doctor_list
+
+
+def find_free_slot(doctor):
+    for slot in reversed(doctor["available_slots"]):
+        if mock_db.is_slot_available(doctor["doctor_id"], slot["date"], slot["time"]):
+            return slot
+    raise RuntimeError(f"{doctor['name']} has no free slot")
+
+
+def measure(func, min_time, max_calls):
+    """Call ``func`` until min_time has elapsed; return per-call timings (us)"""
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < max_calls:
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1e6)
+        if time.perf_counter() >= deadline:
+            break
+    return timings
+
+
+async def measure_tool(name, args_factory, undo, min_time, max_calls):
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < max_calls:
+        args = args_factory()
+        started = time.perf_counter()
+        result = await handle_tool_call(name, args)
+        timings.append((time.perf_counter() - started) * 1e6)
+        if result.get("status") == "error":
+            raise RuntimeError(f"{name} failed: {result['message']}")
+        if undo:
+            undo(args)
+        if time.perf_counter() >= deadline:
+            break
+    return timings
+
+
+def tool_cases(doctors):
+    """Arguments (and state undo hooks) for every registered tool"""
+    target = doctors[-1]
+    booked = next(reversed(mock_db.APPOINTMENTS.values()), None)
+    patient_name = booked["patient_name"] if booked else "Benchmark Patient"
+    free_slot = find_free_slot(target)
+    booking = {
+        "doctor_name": target["name"],
+        "date": free_slot["date"],
+        "time": free_slot["time"],
+        "patient_name": "Benchmark Patient",
+    }
+
+    def undo_booking(args):
+        mock_db.cancel_appointment_in_db(
+            target["doctor_id"], args["date"], args["time"], args["patient_name"]
+        )
+
+    def undo_cancel(args):
+        mock_db.book_appointment_in_db(
+            target["doctor_id"], target["name"], args["date"], args["time"],
+            args["patient_name"],
+        )
+
+    cases = {
+        "list_doctors": (lambda: {}, None),
+        "get_available_slots": (lambda: {"doctor_name": target["name"]}, None),
+        "book_appointment": (lambda: dict(booking), undo_booking),
+        "cancel_appointment": (lambda: dict(booking), undo_cancel),
+        "list_patient_appointments": (lambda: {"patient_name": patient_name}, None),
+        "end_call": (lambda: {}, None),
+    }
+    missing = set(TOOL_FUNCTIONS) - set(cases)
+    if missing:
+        raise RuntimeError(f"No benchmark arguments for tools: {sorted(missing)}")
+    return cases, booking
+
+
+def summarize(scenario, name, timings):
+    return {
+        "scenario": scenario,
+        "name": name,
+        "calls": len(timings),
+        "median_us": round(statistics.median(timings), 3),
+        "mean_us": round(statistics.fmean(timings), 3),
+        "min_us": round(min(timings), 3),
+    }
+
+
+async def run_scenario(doctor_count, appointment_count, args):
+    scenario = f"{doctor_count}x{appointment_count}"
+    started = time.perf_counter()
+    doctors = build_dataset(doctor_count, appointment_count, args.seed)
+    print(
+        f"[{scenario}] dataset ready in {time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+
+    results = []
+    target = doctors[-1]
+    booked = next(reversed(mock_db.APPOINTMENTS.values()), None)
+    free_slot = find_free_slot(target)
+    helpers = {
+        "get_doctor_by_name": lambda: mock_db.get_doctor_by_name(target["name"]),
+        "is_slot_available:free": lambda: mock_db.is_slot_available(
+            target["doctor_id"], free_slot["date"], free_slot["time"]
+        ),
+        "create_system_prompt": create_system_prompt,
+    }
+    if booked:
+        helpers["is_slot_available:booked"] = lambda: mock_db.is_slot_available(
+            booked["doctor_id"], booked["date"], booked["time"]
+        )
+        helpers["get_patient_appointments"] = lambda: mock_db.get_patient_appointments(
+            booked["patient_name"]
+        )
+    for name, func in helpers.items():
+        timings = measure(func, args.min_time, args.max_calls)
+        results.append(summarize(scenario, name, timings))
+
+    cases, booking = tool_cases(doctors)
+    for name in TOOL_FUNCTIONS:
+        args_factory, undo = cases[name]
+        if name == "cancel_appointment":
+            # Make sure there is something to cancel
+            mock_db.book_appointment_in_db(
+                target["doctor_id"], target["name"], booking["date"],
+                booking["time"], booking["patient_name"],
+            )
+        timings = await measure_tool(
+            name, args_factory, undo, args.min_time, args.max_calls
+        )
+        if name == "cancel_appointment":
+            mock_db.cancel_appointment_in_db(
+                target["doctor_id"], booking["date"], booking["time"],
+                booking["patient_name"],
+            )
+        results.append(summarize(scenario, f"tool:{name}", timings))
+
+    for result in results:
+        print(
+            f"[{scenario}] {result['name']:<28} {result['median_us']:>14.1f} us "
+            f"({result['calls']} calls)",
+            file=sys.stderr,
+        )
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = {
+            (r["scenario"], r["name"]): r for r in json.load(f)["results"]
+        }
+
+    regressions = []
+    print(f"{'benchmark':<44} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for result in results:
+        key = (result["scenario"], result["name"])
+        if key not in baseline:
+            continue
+        before = baseline[key]["median_us"]
+        after = result["median_us"]
+        ratio = after / before if before else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(
+            f"{key[0] + ' ' + key[1]:<44} {before:>10.1f}us {after:>10.1f}us "
+            f"{ratio:>6.2f}x{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenarios", default=DEFAULT_SCENARIOS,
+        help="Comma-separated doctors:appointments pairs",
+    )
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Seconds to spend timing each benchmark")
+    parser.add_argument("--max-calls", type=int, default=10000)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed median slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # Keep logging from the tool layer out of the timings
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    results = []
+    for doctor_count, appointment_count in parse_scenarios(args.scenarios):
+        results += asyncio.run(run_scenario(doctor_count, appointment_count, args))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scenarios": args.scenarios,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
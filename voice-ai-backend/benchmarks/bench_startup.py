@@ -0,0 +1,123 @@
+"""Measure cold start: `import main` time and time-to-ready for /health.
+
+Each run uses a fresh interpreter so nothing is cached in-process. Run from
+the backend folder:
+
+    python benchmarks/bench_startup.py --runs 5 --output startup.json
+
+A dummy GEMINI_API_KEY is used when none is set; no Gemini call is made.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("GEMINI_API_KEY", "benchmark-placeholder")
+    return env
+
+
+def measure_import():
+    code = (
+        "import time; started = time.perf_counter(); import main; "
+        "print(time.perf_counter() - started)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get_health(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+        return json.load(response)
+
+
+def measure_ready(timeout):
+    """Return (ms until /health answers, ms until it reports live_ready)"""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        cwd=BACKEND_DIR, env=_env(),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    health_ms = live_ms = None
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                health = _get_health(port)
+            except OSError:
+                time.sleep(0.005)
+                continue
+            now_ms = (time.perf_counter() - started) * 1000
+            if health_ms is None:
+                health_ms = now_ms
+            if health.get("live_ready", True):
+                live_ms = now_ms
+                break
+            time.sleep(0.005)
+    finally:
+        server.terminate()
+        server.wait()
+    if health_ms is None:
+        raise RuntimeError(f"/health did not answer within {timeout}s")
+    return health_ms, live_ms
+
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "median_ms": round(statistics.median(values), 1),
+        "min_ms": round(min(values), 1),
+        "max_ms": round(max(values), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    imports, health, live = [], [], []
+    for _ in range(args.runs):
+        imports.append(measure_import())
+        health_ms, live_ms = measure_ready(args.timeout)
+        health.append(health_ms)
+        live.append(live_ms)
+
+    report = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "import_main": summarize(imports),
+        "health_ready": summarize(health),
+        "live_ready": summarize(live),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare encode cost and wire size of the JSON and binary /voice protocols.
+
+Run from the backend folder:
+
+    python benchmarks/bench_wire_protocol.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from protocol import MSG_AUDIO, encode_event, encode_frame  # noqa: E402
+
+ITERATIONS = 100_000
+
+# 40 ms of 24 kHz PCM16 mono, a typical Gemini output chunk
+AUDIO_CHUNK = b"\x00\x01" * 960
+
+EVENTS = {
+    "audio_format": {"encoding": "pcm16", "sample_rate": 24000, "channels": 1},
+    "tool_event": {
+        "tool": "book_appointment",
+        "status": "success",
+        "message": "Perfect! I've booked your appointment with Dr. John Smith "
+        "on 2025-11-10 at 10:30. Your appointment is confirmed.",
+    },
+    "transcript": {"message": "Sure, let me check Dr. Lee's availability."},
+}
+
+
+def encode_json_event(event_type, payload):
+    # Mirrors starlette's WebSocket.send_json text encoding
+    return json.dumps(
+        {"type": event_type, **payload}, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def bench(label, func):
+    seconds = timeit.timeit(func, number=ITERATIONS)
+    size = len(func())
+    print(f"{label:<28} {seconds / ITERATIONS * 1e6:8.3f} us/msg {size:6d} bytes")
+
+
+def main():
+    print(f"{'message':<28} {'encode':>14} {'wire':>12}")
+    bench("audio json (raw frame)", lambda: AUDIO_CHUNK)
+    bench("audio binary", lambda: encode_frame(MSG_AUDIO, 1, AUDIO_CHUNK))
+    for event_type, payload in EVENTS.items():
+        bench(f"{event_type} json", lambda: encode_json_event(event_type, payload))
+        bench(f"{event_type} binary", lambda: encode_event(event_type, 1, payload))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Replay a recorded call through /voice and report per-turn latency.
+
+Record calls by starting the server with CALL_RECORDING_DIR set. To take
+Gemini out of the measurement, serve the same recording from the local
+stand-in (GEMINI_STANDIN_RECORDING=<recording>), then drive it from here:
+
+    python benchmarks/replay_call.py recordings/<call> --output before.json
+    python benchmarks/replay_call.py recordings/<call> --compare before.json
+
+``--speed 4`` sends the caller side four times faster than it was recorded.
+The stand-in lifts the server's ingest rate limits for this; against a
+server talking to Gemini, raise ``AUDIO_BYTES_PER_SECOND`` and
+``MESSAGES_PER_SECOND`` (and their ``IP_`` variants) by the same factor.
+If the server closes the call early, its close code is reported under
+``closed_by_server``.
+Latency is measured to the first frame the server sends back, from each
+text/audio_end turn and, for spoken turns closed by Gemini's voice activity
+detection, from the inbound audio frame after which the recorded reply
+started.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+
+import websockets
+from websockets.exceptions import ConnectionClosed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recording import SRC_CLIENT, load_recording, reply_groups  # noqa: E402
+
+TURN_END_EVENTS = {"text", "audio_end"}
+
+
+async def replay(recording, url, speed, tail):
+    client_events = [e for e in recording.events if e["src"] == SRC_CLIENT]
+    # Inbound byte offsets at which a spoken turn's reply started
+    spoken_offsets = [
+        group["in_off"] for group in reply_groups(recording.events)
+        if group["trigger"] == "audio"
+    ]
+    next_spoken = 0
+    turns = []
+    pending = None  # (recorded time, sent at, kind) of the turn awaiting a reply
+    greeting_ms = None
+    close = None  # close code and reason when the server ended the call early
+
+    async with websockets.connect(url, max_size=None) as ws:
+        started = time.perf_counter()
+
+        async def receive():
+            nonlocal pending, greeting_ms
+            with contextlib.suppress(ConnectionClosed):
+                async for _ in ws:
+                    now = time.perf_counter()
+                    if greeting_ms is None:
+                        greeting_ms = (now - started) * 1000
+                    if pending:
+                        recorded_at, sent_at, kind = pending
+                        turns.append({
+                            "t": recorded_at,
+                            "kind": kind,
+                            "latency_ms": round((now - sent_at) * 1000, 3),
+                        })
+                        pending = None
+
+        receiver = asyncio.create_task(receive())
+        try:
+            for event in client_events:
+                delay = started + event["t"] / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if event["kind"] == "audio":
+                    await ws.send(bytes(recording.audio(event)))
+                    sent_bytes = event["off"] + event["len"]
+                    reached = False
+                    while next_spoken < len(spoken_offsets) and sent_bytes >= spoken_offsets[next_spoken]:
+                        next_spoken += 1
+                        reached = True
+                    if reached:
+                        pending = (event["t"], time.perf_counter(), "speech")
+                    continue
+                await ws.send(json.dumps(event["payload"]))
+                turn_type = event["payload"].get("type")
+                if turn_type in TURN_END_EVENTS:
+                    pending = (event["t"], time.perf_counter(), turn_type)
+
+            await asyncio.sleep(tail)
+        except ConnectionClosed:
+            pass
+        receiver.cancel()
+        if ws.close_code is not None:
+            close = {"code": ws.close_code, "reason": ws.close_reason}
+            print(
+                f"Server closed the call early: {ws.close_code} {ws.close_reason}",
+                file=sys.stderr,
+            )
+
+    return greeting_ms, turns, close
+
+
+def summarize(latencies):
+    if not latencies:
+        return {"turns": 0}
+    ordered = sorted(latencies)
+    return {
+        "turns": len(ordered),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def compare(report, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"{'metric':<12} {'baseline':>12} {'current':>12} {'delta':>12}")
+    for key in ("greeting_ms", "median_ms", "p95_ms", "max_ms"):
+        before = baseline["greeting_ms"] if key == "greeting_ms" else baseline["summary"].get(key)
+        after = report["greeting_ms"] if key == "greeting_ms" else report["summary"].get(key)
+        if before is None or after is None:
+            continue
+        print(f"{key:<12} {before:>10.1f}ms {after:>10.1f}ms {after - before:>+10.1f}ms")
+    for old, new in zip(baseline["turns"], report["turns"]):
+        print(
+            f"turn @{new['t']:>8.2f}s {old['latency_ms']:>10.1f}ms "
+            f"{new['latency_ms']:>10.1f}ms {new['latency_ms'] - old['latency_ms']:>+10.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", help="Recording directory written by the server")
+    parser.add_argument("--url", default="ws://localhost:8000/voice")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay speed multiplier for the caller side")
+    parser.add_argument("--tail", type=float, default=3.0,
+                        help="Seconds to keep listening after the last event")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    parser.add_argument("--compare", help="Report from another build to diff against")
+    args = parser.parse_args()
+
+    recording = load_recording(args.recording)
+    try:
+        greeting_ms, turns, close = asyncio.run(
+            replay(recording, args.url, args.speed, args.tail)
+        )
+    finally:
+        recording.close()
+
+    report = {
+        "recording": os.path.abspath(args.recording),
+        "url": args.url,
+        "speed": args.speed,
+        "greeting_ms": round(greeting_ms, 3) if greeting_ms is not None else None,
+        "summary": summarize([turn["latency_ms"] for turn in turns]),
+        "turns": turns,
+        "closed_by_server": close,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,20 +3,33 @@ import logging
 import json
 import asyncio
 import contextlib
-from typing import Optional
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+import hashlib
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from google import genai
-from google.genai import types
 from utils import (
     setup_logging,
     SessionManager,
     create_system_prompt,
     handle_tool_call,
     format_tool_response,
+    compact_tool_result,
+    is_voiced_pcm16,
 )
-from tools import AVAILABLE_TOOLS
-from mock_db import get_all_doctors
+from mock_db import (
+    DOCTORS,
+    get_all_doctors,
+    get_doctor_by_name,
+    get_free_slots,
+    get_patient_appointments,
+    get_store_version,
+)
+from protocol import ProtocolError, create_wire, negotiate_subprotocol
+from recording import open_recorder
+from ratelimit import INVALID_AUDIO, RateLimits
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -25,8 +38,14 @@ load_dotenv()
 # Setup logging
 logger = setup_logging()
 
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start loading the Gemini runtime without holding up /health"""
+    start_live_runtime()
+    yield
+
 # Initialize FastAPI app
-app = FastAPI(title="Voice AI Hospital Assistant", version="1.0.0")
+app = FastAPI(title="Voice AI Hospital Assistant", version="1.0.0", lifespan=lifespan)
 
 # Configure CORS
 default_origins = [
@@ -55,16 +74,172 @@ app.add_middleware(
 
 # Initialize Gemini
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
+# Serve /voice from a recorded call instead of Gemini (see standin.py)
+STANDIN_RECORDING = os.getenv("GEMINI_STANDIN_RECORDING")
+if not GEMINI_API_KEY and not STANDIN_RECORDING:
     logger.error("GEMINI_API_KEY environment variable not set")
     raise ValueError("GEMINI_API_KEY environment variable is required")
 
-# Initialize the genai client
-client = genai.Client(api_key=GEMINI_API_KEY)
 MODEL = "gemini-2.5-flash-native-audio-preview-09-2025"
 INPUT_SAMPLE_RATE = 16000
 OUTPUT_SAMPLE_RATE = 24000
 AUDIO_INPUT_MIME_TYPE = f"audio/pcm;rate={INPUT_SAMPLE_RATE}"
+# Mean absolute PCM16 level at which an inbound frame counts as caller speech
+SPEECH_LEVEL_THRESHOLD = float(os.getenv("SPEECH_LEVEL_THRESHOLD", 500))
+
+# Context window management for long calls ("sliding_window" or "off")
+CONTEXT_COMPRESSION = os.getenv("CONTEXT_COMPRESSION", "sliding_window").lower()
+CONTEXT_TRIGGER_TOKENS = int(os.getenv("CONTEXT_TRIGGER_TOKENS", 24000))
+CONTEXT_TARGET_TOKENS = int(os.getenv("CONTEXT_TARGET_TOKENS", 12000))
+
+# Call lifetime limits in seconds (0 disables the limit)
+IDLE_TIMEOUT_SECONDS = float(os.getenv("IDLE_TIMEOUT_SECONDS", 60))
+MAX_CALL_DURATION_SECONDS = float(os.getenv("MAX_CALL_DURATION_SECONDS", 1800))
+# Longest we wait for the goodbye turn to finish after end_call
+END_CALL_GRACE_SECONDS = float(os.getenv("END_CALL_GRACE_SECONDS", 15))
+SUPERVISOR_INTERVAL_SECONDS = 1.0
+
+# Replays against the local stand-in may send the caller side faster than
+# real time (replay_call.py --speed), so its rate limits are lifted; frame
+# size checks still apply
+RATE_LIMIT_SCALE = float("inf") if STANDIN_RECORDING else 1.0
+
+# Per-connection and per-client-IP ingest limits for /voice
+RATE_LIMITS = RateLimits(
+    audio_bytes_per_second=float(os.getenv("AUDIO_BYTES_PER_SECOND", 64000)) * RATE_LIMIT_SCALE,
+    messages_per_second=float(os.getenv("MESSAGES_PER_SECOND", 100)) * RATE_LIMIT_SCALE,
+    ip_audio_bytes_per_second=float(os.getenv("IP_AUDIO_BYTES_PER_SECOND", 256000)) * RATE_LIMIT_SCALE,
+    ip_messages_per_second=float(os.getenv("IP_MESSAGES_PER_SECOND", 400)) * RATE_LIMIT_SCALE,
+    max_audio_frame_bytes=int(os.getenv("MAX_AUDIO_FRAME_BYTES", 32000)),
+    max_text_payload_bytes=int(os.getenv("MAX_TEXT_PAYLOAD_BYTES", 4096)),
+    max_connections_per_ip=int(os.getenv("MAX_CONNECTIONS_PER_IP", 5)),
+    ip_idle_ttl_seconds=float(os.getenv("IP_LIMIT_TTL_SECONDS", 300)),
+)
+# Number of trusted proxies in front of the app that append to X-Forwarded-For
+# (Render: 1). 0 uses the socket peer address.
+FORWARDED_HOPS = int(os.getenv("FORWARDED_HOPS", 0))
+
+
+def client_ip(websocket: WebSocket) -> str:
+    """Client address for rate limiting.
+
+    Only entries appended by our own proxies are trusted: with N hops the
+    client is the Nth entry from the right, since anything further left was
+    supplied by the client itself.
+    """
+    peer = websocket.client.host if websocket.client else "unknown"
+    if not FORWARDED_HOPS:
+        return peer
+    forwarded = [
+        hop.strip()
+        for hop in websocket.headers.get("x-forwarded-for", "").split(",")
+        if hop.strip()
+    ]
+    if len(forwarded) < FORWARDED_HOPS:
+        return peer
+    return forwarded[-FORWARDED_HOPS]
+
+# WebSocket close codes sent when the server ends a call
+CLOSE_CODES = {
+    "end_call": 1000,
+    "rate_limited": 1008,
+    "too_many_connections": 1008,
+    "payload_too_large": 1009,
+    "idle_timeout": 4000,
+    "max_duration": 4001,
+}
+
+GREETING_PROMPT = (
+    "The caller just connected to the hospital's voice line. "
+    "Greet them warmly like a human receptionist and invite them "
+    "to share how you can help."
+)
+
+
+def build_context_window_compression(types):
+    """Build the context window compression policy for the live session"""
+    if CONTEXT_COMPRESSION == "off":
+        return None
+    if CONTEXT_COMPRESSION != "sliding_window":
+        logger.warning(
+            f"Unknown CONTEXT_COMPRESSION '{CONTEXT_COMPRESSION}', using sliding_window"
+        )
+    return types.ContextWindowCompressionConfig(
+        trigger_tokens=CONTEXT_TRIGGER_TOKENS,
+        sliding_window=types.SlidingWindow(target_tokens=CONTEXT_TARGET_TOKENS),
+    )
+
+
+class LiveRuntime:
+    """The genai client plus the live config and greeting shared by every call.
+
+    Building this imports the google.genai stack, which dominates cold start,
+    so it happens once, off the event loop, after the server is accepting
+    requests.
+    """
+
+    def __init__(self):
+        from google.genai import types
+        from tools import AVAILABLE_TOOLS
+
+        self.types = types
+        if STANDIN_RECORDING:
+            from standin import ReplayLiveClient
+
+            logger.info(f"Serving Gemini replies from recording {STANDIN_RECORDING}")
+            self.client = ReplayLiveClient(STANDIN_RECORDING)
+        else:
+            from google import genai
+
+            self.client = genai.Client(api_key=GEMINI_API_KEY)
+
+        self.config = types.LiveConnectConfig(
+            response_modalities=["AUDIO"],
+            system_instruction=types.Content(
+                role="system",
+                parts=[types.Part(text=create_system_prompt())],
+            ),
+            tools=AVAILABLE_TOOLS,
+            context_window_compression=build_context_window_compression(types),
+        )
+        self.greeting = types.LiveClientContent(
+            turns=[
+                types.Content(
+                    role="user",
+                    parts=[types.Part(text=GREETING_PROMPT)],
+                )
+            ],
+            turn_complete=True,
+        )
+
+
+_live_runtime_task: Optional[asyncio.Task] = None
+
+
+def _live_runtime_failed() -> bool:
+    task = _live_runtime_task
+    return task.done() and (task.cancelled() or task.exception() is not None)
+
+
+def start_live_runtime() -> asyncio.Task:
+    """Begin building the LiveRuntime in a worker thread (once, retried on failure)"""
+    global _live_runtime_task
+    if _live_runtime_task is None or _live_runtime_failed():
+        _live_runtime_task = asyncio.create_task(asyncio.to_thread(LiveRuntime))
+    return _live_runtime_task
+
+
+async def get_live_runtime() -> LiveRuntime:
+    """Wait for the shared LiveRuntime, starting it if needed"""
+    return await asyncio.shield(start_live_runtime())
+
+
+def live_runtime_ready() -> bool:
+    return (
+        _live_runtime_task is not None
+        and _live_runtime_task.done()
+        and not _live_runtime_failed()
+    )
 
 # Initialize session manager
 session_manager = SessionManager()
@@ -74,72 +249,202 @@ async def root():
     """Health check endpoint"""
     return {"message": "Voice AI Hospital Assistant API", "status": "healthy"}
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# The store version restarts at 0 in every process and bookings are kept in
+# memory, so tags carry a per-process id to never match across restarts or
+# workers
+BOOT_ID = uuid.uuid4().hex[:8]
+# The roster does not change at runtime, so /doctors has a constant tag
+DOCTORS_VERSION = hashlib.sha1(
+    json.dumps(get_all_doctors()).encode("utf-8")
+).hexdigest()[:12]
+
+
+def versioned_response(
+    request: Request,
+    resource: str,
+    key: str,
+    build_rows: Callable[[], Iterable[Any]],
+    version: Any = None,
+) -> Response:
+    """Serve rows as JSON or streamed NDJSON with an ETag tied to ``version``.
+
+    ``version`` defaults to the appointment store version, and the tag also
+    carries BOOT_ID so it cannot match one issued by another process. Rows are
+    snapshotted right after it is read, with no await in between, so the body
+    always matches its tag even though NDJSON encoding runs in a worker
+    thread. Clients that send ``Accept: application/x-ndjson`` get one JSON
+    document per line instead of a single ``{key: [...]}`` body.
+    """
+    if version is None:
+        version = get_store_version()
+    stream = NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    etag = f'"{resource}-{BOOT_ID}-{version}-{"ndjson" if stream else "json"}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    rows = list(build_rows())
+    if stream:
+        return StreamingResponse(
+            (json.dumps(row) + "\n" for row in rows),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=headers,
+        )
+    return JSONResponse({key: rows}, headers=headers)
+
+
+def _validate_date(value: Optional[str], field: str) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{field} must be in YYYY-MM-DD format")
+    return value
+
+
 @app.get("/doctors")
-async def get_doctors():
+async def get_doctors(request: Request):
     """Get list of available doctors"""
     try:
-        doctors = get_all_doctors()
-        return {"doctors": doctors}
+        return versioned_response(
+            request, "doctors", "doctors", get_all_doctors, DOCTORS_VERSION
+        )
     except Exception as e:
         logger.error(f"Error getting doctors: {e}")
         raise HTTPException(status_code=500, detail="Failed to get doctors")
 
+@app.get("/availability")
+async def get_availability(
+    request: Request,
+    doctor: Optional[str] = None,
+    specialty: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+):
+    """Get free slots per doctor, filtered by doctor, specialty and date range"""
+    start_date = _validate_date(start_date, "start_date")
+    end_date = _validate_date(end_date, "end_date")
+
+    if doctor:
+        match = get_doctor_by_name(doctor)
+        if not match:
+            raise HTTPException(status_code=404, detail=f"No doctor named {doctor}")
+        doctors = [match]
+    else:
+        doctors = list(DOCTORS.values())
+    if specialty:
+        doctors = [d for d in doctors if d["specialty"].lower() == specialty.lower()]
+
+    def build_rows():
+        return (
+            {
+                "doctor_id": d["doctor_id"],
+                "name": d["name"],
+                "specialty": d["specialty"],
+                "slots": get_free_slots(d["doctor_id"], start_date, end_date),
+            }
+            for d in doctors
+        )
+
+    return versioned_response(request, "availability", "availability", build_rows)
+
+@app.get("/appointments")
+async def get_appointments(request: Request, patient: str):
+    """Get booked appointments for a patient"""
+    return versioned_response(
+        request, "appointments", "appointments",
+        lambda: get_patient_appointments(patient),
+    )
+
 @app.websocket("/voice")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for voice conversation"""
-    await websocket.accept()
+    subprotocol = negotiate_subprotocol(websocket)
+    await websocket.accept(subprotocol=subprotocol)
+    wire = create_wire(websocket, subprotocol)
+    ip = client_ip(websocket)
+    limiter = RATE_LIMITS.connect(ip)
+    if limiter is None:
+        logger.warning(f"Rejecting /voice connection from {ip}: too many connections")
+        session_manager.record_close("too_many_connections")
+        await websocket.close(code=CLOSE_CODES["too_many_connections"], reason="too_many_connections")
+        return
     session_id = f"session_{id(websocket)}"
     session_manager.create_session(session_id)
-    logger.info(f"WebSocket connected: {session_id}")
+    recorder = open_recorder(session_id)
+    logger.info(f"WebSocket connected: {session_id} ({wire.name} protocol)")
+    # Why the call ended; set by the supervisor when the server closes it
+    close_reason = "client_disconnect"
     
     try:
-        # Configuration for the live session
-        config = types.LiveConnectConfig(
-            response_modalities=["AUDIO"],
-            system_instruction=types.Content(
-                role="system",
-                parts=[types.Part(text=create_system_prompt())],
-            ),
-            tools=AVAILABLE_TOOLS,
-        )
+        runtime = await get_live_runtime()
+        types = runtime.types
         
-        async with client.aio.live.connect(model=MODEL, config=config) as session:
+        async with runtime.client.aio.live.connect(model=MODEL, config=runtime.config) as session:
             logger.info(f"Gemini live session started for {session_id}")
 
             # Prompt the assistant to greet the caller immediately
-            await session.send(
-                input=types.LiveClientContent(
-                    turns=[
-                        types.Content(
-                            role="user",
-                            parts=[
-                                types.Part(
-                                    text=(
-                                        "The caller just connected to the hospital's voice line. "
-                                        "Greet them warmly like a human receptionist and invite them "
-                                        "to share how you can help."
-                                    )
-                                )
-                            ],
-                        )
-                    ],
-                    turn_complete=True,
-                )
-            )
+            await session.send(input=runtime.greeting)
+            if recorder:
+                recorder.upstream_turn("greeting")
             
             audio_format_sent = False
+            loop = asyncio.get_running_loop()
+            call_started_at = loop.time()
+            last_client_activity = call_started_at
+            end_call_requested_at: Optional[float] = None
+            goodbye_complete = asyncio.Event()
+            # Estimated time the client finishes playing audio sent so far
+            playback_ends_at = call_started_at
+            # Time the caller's (or a tool's) turn ended, cleared on first reply
+            turn_started_at: Optional[float] = None
+            # Spoken turns are ended by Gemini's voice activity detection, so
+            # their boundary is the last voiced frame since the model's turn
+            last_caller_speech_at: Optional[float] = None
+            model_turn_done_at: Optional[float] = None
+
+            def mark_turn_end(reason: str):
+                nonlocal turn_started_at
+                turn_started_at = loop.time()
+                if recorder:
+                    recorder.upstream_turn(reason)
+
+            def record_first_response():
+                nonlocal turn_started_at, model_turn_done_at
+                started_at = turn_started_at
+                if (
+                    started_at is None
+                    and model_turn_done_at is not None
+                    and last_caller_speech_at is not None
+                    and last_caller_speech_at > model_turn_done_at
+                ):
+                    started_at = last_caller_speech_at
+                turn_started_at = None
+                model_turn_done_at = None
+                if started_at is None:
+                    return
+                latency = loop.time() - started_at
+                elapsed = session_manager.record_turn_latency(session_id, latency)
+                logger.info(
+                    f"Turn latency for {session_id}: {latency * 1000:.0f} ms "
+                    f"at {elapsed:.0f}s into call"
+                )
 
             async def announce_audio_format_once():
                 nonlocal audio_format_sent
                 if audio_format_sent:
                     return
-                await websocket.send_json(
+                await wire.send_event(
+                    "audio_format",
                     {
-                        "type": "audio_format",
                         "encoding": "pcm16",
                         "sample_rate": OUTPUT_SAMPLE_RATE,
                         "channels": 1,
-                    }
+                    },
                 )
                 audio_format_sent = True
 
@@ -150,6 +455,13 @@ async def websocket_endpoint(websocket: WebSocket):
                     logger.warning("Received non-JSON text payload from frontend")
                     return
 
+                await handle_control_payload(payload)
+
+            async def handle_control_payload(payload: dict):
+                nonlocal last_client_activity
+                last_client_activity = loop.time()
+                if recorder:
+                    recorder.client_event(payload)
                 payload_type = payload.get("type")
                 if payload_type == "text":
                     text_content = payload.get("message") or payload.get("content")
@@ -167,7 +479,9 @@ async def websocket_endpoint(websocket: WebSocket):
                             turn_complete=True,
                         )
                     )
+                    mark_turn_end("text")
                 elif payload_type == "audio_end":
+                    mark_turn_end("audio_end")
                     await session.send(
                         input=types.LiveClientRealtimeInput(media_chunks=[]),
                         end_of_turn=True,
@@ -176,8 +490,9 @@ async def websocket_endpoint(websocket: WebSocket):
                     logger.debug(f"Unsupported payload type from frontend: {payload_type}")
 
             async def forward_tool_responses(
-                function_calls: Optional[list[types.FunctionCall]],
+                function_calls: Optional[list],
             ):
+                nonlocal end_call_requested_at
                 if not function_calls:
                     return
 
@@ -187,25 +502,28 @@ async def websocket_endpoint(websocket: WebSocket):
                     logger.info(f"Tool call requested: {tool_name} with args {tool_args}")
 
                     tool_result = await handle_tool_call(tool_name, tool_args)
+                    if tool_name == "end_call":
+                        end_call_requested_at = loop.time()
+                        logger.info(f"end_call requested for {session_id}")
                     spoken_summary = format_tool_response(tool_name, tool_result)
 
                     response_payload = types.FunctionResponse(
                         id=func_call.id,
                         name=tool_name,
                         response={
-                            "output": tool_result,
+                            "output": compact_tool_result(tool_result),
                             "spoken_summary": spoken_summary,
                         },
                     )
 
                     try:
-                        await websocket.send_json(
+                        await wire.send_event(
+                            "tool_event",
                             {
-                                "type": "tool_event",
                                 "tool": tool_name,
                                 "status": tool_result.get("status"),
                                 "message": spoken_summary,
-                            }
+                            },
                         )
                     except Exception as send_err:
                         logger.warning(f"Failed to forward tool event: {send_err}")
@@ -215,8 +533,10 @@ async def websocket_endpoint(websocket: WebSocket):
                             function_responses=[response_payload]
                         )
                     )
+                    mark_turn_end("tool_response")
 
             async def handle_websocket_messages():
+                nonlocal last_client_activity, last_caller_speech_at, close_reason
                 try:
                     while True:
                         message = await websocket.receive()
@@ -224,8 +544,41 @@ async def websocket_endpoint(websocket: WebSocket):
                             raise WebSocketDisconnect()
 
                         if message.get("bytes"):
-                            audio_chunk = message["bytes"]
+                            frame = message["bytes"]
+                            payload_size = max(0, len(frame) - wire.header_size)
+                            if wire.is_control(frame):
+                                violation = limiter.check_text(payload_size)
+                            else:
+                                violation = limiter.check_audio(payload_size)
+                            if violation == INVALID_AUDIO:
+                                if limiter.invalid_audio_frames == 1:
+                                    logger.warning(
+                                        f"Dropping non-PCM16 audio frames from {session_id}"
+                                    )
+                                continue
+                            if violation:
+                                close_reason = violation
+                                return
+
+                            try:
+                                kind, data = wire.decode_bytes(frame)
+                            except (ProtocolError, json.JSONDecodeError) as err:
+                                logger.warning(f"Dropping malformed frame: {err}")
+                                continue
+
+                            if kind == "event":
+                                await handle_control_payload(data)
+                                continue
+
+                            audio_chunk = data
                             if audio_chunk:
+                                if is_voiced_pcm16(audio_chunk, SPEECH_LEVEL_THRESHOLD):
+                                    # An open mic streams silence, so only speech
+                                    # keeps the call from going idle
+                                    last_caller_speech_at = loop.time()
+                                    last_client_activity = last_caller_speech_at
+                                if recorder:
+                                    recorder.client_audio(audio_chunk)
                                 await session.send(
                                     input=types.LiveClientRealtimeInput(
                                         media_chunks=[
@@ -237,7 +590,17 @@ async def websocket_endpoint(websocket: WebSocket):
                                     )
                                 )
                         elif message.get("text"):
-                            await handle_text_payload(message["text"])
+                            text = message["text"]
+                            # The limit is in UTF-8 bytes; every character is at
+                            # least one byte, so only encode texts that may fit
+                            text_size = len(text)
+                            if text_size <= RATE_LIMITS.max_text_payload_bytes:
+                                text_size = len(text.encode("utf-8"))
+                            violation = limiter.check_text(text_size)
+                            if violation:
+                                close_reason = violation
+                                return
+                            await handle_text_payload(text)
 
                 except WebSocketDisconnect:
                     logger.info(f"WebSocket disconnected: {session_id}")
@@ -247,9 +610,12 @@ async def websocket_endpoint(websocket: WebSocket):
                     return
             
             async def handle_gemini_responses():
+                nonlocal playback_ends_at, model_turn_done_at
                 try:
                     while True:
                         async for response in session.receive():
+                            if recorder:
+                                recorder.gemini_response(response)
                             if response.setup_complete:
                                 logger.info("Gemini live session setup complete")
                                 continue
@@ -260,8 +626,12 @@ async def websocket_endpoint(websocket: WebSocket):
                                 )
 
                             if response.data:
+                                record_first_response()
                                 await announce_audio_format_once()
-                                await websocket.send_bytes(response.data)
+                                await wire.send_audio(response.data)
+                                playback_ends_at = max(playback_ends_at, loop.time()) + (
+                                    len(response.data) / (OUTPUT_SAMPLE_RATE * 2)
+                                )
 
                             text_parts = []
                             if (
@@ -278,24 +648,60 @@ async def websocket_endpoint(websocket: WebSocket):
                             if text_parts:
                                 combined_text = " ".join(text_parts).strip()
                                 if combined_text:
+                                    record_first_response()
                                     logger.info(
                                         f"Gemini text response: {combined_text}"
                                     )
-                                    await websocket.send_json(
-                                        {
-                                            "type": "transcript",
-                                            "message": combined_text,
-                                        }
+                                    await wire.send_event(
+                                        "transcript",
+                                        {"message": combined_text},
                                     )
+
+                            if (
+                                response.server_content
+                                and response.server_content.turn_complete
+                            ):
+                                model_turn_done_at = loop.time()
+                                if end_call_requested_at is not None:
+                                    goodbye_complete.set()
                 except Exception as e:
                     logger.error(f"Error handling Gemini response: {e}")
+
+            async def supervise_call():
+                """Return once the call should be closed by the server"""
+                nonlocal close_reason
+                while True:
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(
+                            goodbye_complete.wait(), SUPERVISOR_INTERVAL_SECONDS
+                        )
+                    now = loop.time()
+                    if end_call_requested_at is not None and (
+                        goodbye_complete.is_set()
+                        or now - end_call_requested_at > END_CALL_GRACE_SECONDS
+                    ):
+                        # Let the client finish playing the goodbye
+                        await asyncio.sleep(max(0.0, playback_ends_at - now))
+                        close_reason = "end_call"
+                        return
+                    # Idle time counts from the caller's last speech or message,
+                    # or from when the assistant's audio finished playing
+                    idle_since = max(last_client_activity, playback_ends_at)
+                    if IDLE_TIMEOUT_SECONDS and now - idle_since > IDLE_TIMEOUT_SECONDS:
+                        close_reason = "idle_timeout"
+                        return
+                    if MAX_CALL_DURATION_SECONDS and now - call_started_at > MAX_CALL_DURATION_SECONDS:
+                        close_reason = "max_duration"
+                        return
             
-            # Run both handlers concurrently
+            # Run both handlers concurrently, plus the call supervisor
             ws_task = asyncio.create_task(handle_websocket_messages())
             gemini_task = asyncio.create_task(handle_gemini_responses())
+            supervisor_task = asyncio.create_task(supervise_call())
 
             done, pending = await asyncio.wait(
-                {ws_task, gemini_task}, return_when=asyncio.FIRST_COMPLETED
+                {ws_task, gemini_task, supervisor_task},
+                return_when=asyncio.FIRST_COMPLETED,
             )
 
             for task in pending:
@@ -305,20 +711,38 @@ async def websocket_endpoint(websocket: WebSocket):
 
             for task in done:
                 task.result()
+            if gemini_task in done:
+                close_reason = "upstream_closed"
+
+        if close_reason in CLOSE_CODES:
+            logger.info(f"Closing {session_id}: {close_reason}")
+            await websocket.close(code=CLOSE_CODES[close_reason], reason=close_reason)
             
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected: {session_id}")
     except Exception as e:
+        close_reason = "error"
         logger.error(f"WebSocket error for {session_id}: {e}")
         try:
-            await websocket.send_json({
-                "type": "error",
+            await wire.send_event("error", {
                 "message": f"Sorry, there was a connection error: {str(e)}"
             })
         except:
             pass
     finally:
         logger.info(f"Cleaning up session: {session_id}")
+        latency_summary = session_manager.latency_summary(session_id)
+        if latency_summary["turns"]:
+            logger.info(f"Turn latency summary for {session_id}: {latency_summary}")
+        session_manager.end_session(session_id)
+        session_manager.record_close(close_reason)
+        if limiter.invalid_audio_frames:
+            logger.warning(
+                f"Dropped {limiter.invalid_audio_frames} non-PCM16 audio frames from {session_id}"
+            )
+        RATE_LIMITS.disconnect(limiter)
+        if recorder:
+            recorder.close()
 
 @app.get("/health")
 async def health_check():
@@ -326,7 +750,9 @@ async def health_check():
     return {
         "status": "healthy",
         "gemini_configured": bool(GEMINI_API_KEY),
+        "live_ready": live_runtime_ready(),
         "active_sessions": len(session_manager.sessions),
+        "call_closures": session_manager.close_reasons,
         "model": MODEL,
     }
 
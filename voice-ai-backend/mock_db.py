@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 # Mock database for doctors and appointments
 def _slots_for_day(day: str, start: int, end: int, interval_hours: int = 1):
@@ -77,7 +77,36 @@ DOCTORS = {
 }
 
 # In-memory storage for booked appointments
-APPOINTMENTS = []
+APPOINTMENTS: Dict[int, Dict] = {}
+
+# Secondary indexes, kept in sync with APPOINTMENTS on every book and cancel:
+# appointments keyed by (doctor_id, date, time), and by normalized patient name
+BOOKED_SLOTS: Dict[Tuple[str, str, str], Dict] = {}
+PATIENT_APPOINTMENTS: Dict[str, Dict[int, Dict]] = {}
+
+_next_appointment_id = 1
+
+# Bumped on every booking change so readers can detect stale data (e.g. ETags)
+_store_version = 0
+
+def _bump_version():
+    global _store_version
+    _store_version += 1
+
+def get_store_version() -> int:
+    """Get the current version of the appointment store"""
+    return _store_version
+
+def normalize_patient_name(patient_name: str) -> str:
+    """Normalize a patient name for lookups (case and whitespace insensitive)"""
+    return " ".join(patient_name.split()).casefold()
+
+def clear_appointments():
+    """Remove all booked appointments"""
+    APPOINTMENTS.clear()
+    BOOKED_SLOTS.clear()
+    PATIENT_APPOINTMENTS.clear()
+    _bump_version()
 
 def get_doctor_by_name(doctor_name: str) -> Optional[Dict]:
     """Find doctor by name (case-insensitive partial match)"""
@@ -92,6 +121,22 @@ def get_all_doctors() -> List[str]:
     """Get list of all doctor names"""
     return [doctor["name"] for doctor in DOCTORS.values()]
 
+def is_slot_booked(doctor_id: str, date: str, time: str) -> bool:
+    """Check if a slot already has an appointment"""
+    return (doctor_id, date, time) in BOOKED_SLOTS
+
+def get_free_slots(doctor_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict]:
+    """Get a doctor's unbooked slots, optionally within an inclusive date range"""
+    free_slots = []
+    for slot in DOCTORS[doctor_id]["available_slots"]:
+        if start_date and slot["date"] < start_date:
+            continue
+        if end_date and slot["date"] > end_date:
+            continue
+        if (doctor_id, slot["date"], slot["time"]) not in BOOKED_SLOTS:
+            free_slots.append(slot)
+    return free_slots
+
 def is_slot_available(doctor_id: str, date: str, time: str) -> bool:
     """Check if a specific slot is available"""
     if doctor_id not in DOCTORS:
@@ -108,19 +153,13 @@ def is_slot_available(doctor_id: str, date: str, time: str) -> bool:
         return False
     
     # Check if slot is already booked
-    is_booked = any(
-        appt["doctor_id"] == doctor_id and 
-        appt["date"] == date and 
-        appt["time"] == time
-        for appt in APPOINTMENTS
-    )
-    
-    return not is_booked
+    return not is_slot_booked(doctor_id, date, time)
 
 def book_appointment_in_db(doctor_id: str, doctor_name: str, date: str, time: str, patient_name: str) -> Dict:
     """Book an appointment in the database"""
+    global _next_appointment_id
     appointment = {
-        "id": len(APPOINTMENTS) + 1,
+        "id": _next_appointment_id,
         "doctor_id": doctor_id,
         "doctor_name": doctor_name,
         "date": date,
@@ -130,23 +169,32 @@ def book_appointment_in_db(doctor_id: str, doctor_name: str, date: str, time: st
         "created_at": datetime.now().isoformat()
     }
     
-    APPOINTMENTS.append(appointment)
+    _next_appointment_id += 1
+    
+    APPOINTMENTS[appointment["id"]] = appointment
+    BOOKED_SLOTS[(doctor_id, date, time)] = appointment
+    PATIENT_APPOINTMENTS.setdefault(
+        normalize_patient_name(patient_name), {}
+    )[appointment["id"]] = appointment
+    _bump_version()
     return appointment
 
 def cancel_appointment_in_db(doctor_id: str, date: str, time: str, patient_name: str) -> bool:
     """Cancel an appointment in the database"""
-    for i, appt in enumerate(APPOINTMENTS):
-        if (appt["doctor_id"] == doctor_id and 
-            appt["date"] == date and 
-            appt["time"] == time and 
-            appt["patient_name"].lower() == patient_name.lower()):
-            APPOINTMENTS.pop(i)
-            return True
-    return False
+    appt = BOOKED_SLOTS.get((doctor_id, date, time))
+    patient_key = normalize_patient_name(patient_name)
+    if not appt or normalize_patient_name(appt["patient_name"]) != patient_key:
+        return False
+    
+    del APPOINTMENTS[appt["id"]]
+    del BOOKED_SLOTS[(doctor_id, date, time)]
+    patient_appointments = PATIENT_APPOINTMENTS[patient_key]
+    del patient_appointments[appt["id"]]
+    if not patient_appointments:
+        del PATIENT_APPOINTMENTS[patient_key]
+    _bump_version()
+    return True
 
 def get_patient_appointments(patient_name: str) -> List[Dict]:
     """Get all appointments for a patient"""
-    return [
-        appt for appt in APPOINTMENTS 
-        if appt["patient_name"].lower() == patient_name.lower()
-    ]
+    return list(PATIENT_APPOINTMENTS.get(normalize_patient_name(patient_name), {}).values())
@@ -0,0 +1,144 @@
+import json
+import struct
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import WebSocket
+
+# WebSocket subprotocol a client offers to opt into the binary envelope
+BINARY_SUBPROTOCOL = "voice.binary.v1"
+PROTOCOL_VERSION = 1
+
+# Header: version (u8), message type (u8), sequence (u32), server monotonic
+# timestamp in microseconds (u64). Little-endian, 14 bytes.
+HEADER = struct.Struct("<BBIQ")
+HEADER_SIZE = HEADER.size
+
+# Server -> client message types
+MSG_AUDIO = 0x01
+MSG_AUDIO_FORMAT = 0x02
+MSG_TOOL_EVENT = 0x03
+MSG_TRANSCRIPT = 0x04
+MSG_ERROR = 0x05
+
+# Client -> server message types
+MSG_CLIENT_AUDIO = 0x10
+MSG_CLIENT_TEXT = 0x11
+MSG_CLIENT_AUDIO_END = 0x12
+
+EVENT_TYPES = {
+    "audio_format": MSG_AUDIO_FORMAT,
+    "tool_event": MSG_TOOL_EVENT,
+    "transcript": MSG_TRANSCRIPT,
+    "error": MSG_ERROR,
+}
+
+CLIENT_EVENT_NAMES = {
+    MSG_CLIENT_TEXT: "text",
+    MSG_CLIENT_AUDIO_END: "audio_end",
+}
+
+_SEQUENCE_MASK = 0xFFFFFFFF
+
+
+class ProtocolError(ValueError):
+    """Raised when an inbound frame cannot be decoded"""
+
+
+def negotiate_subprotocol(websocket: WebSocket) -> Optional[str]:
+    """Return the subprotocol to accept, or None for the JSON protocol"""
+    if BINARY_SUBPROTOCOL in websocket.scope.get("subprotocols", []):
+        return BINARY_SUBPROTOCOL
+    return None
+
+
+def encode_frame(message_type: int, sequence: int, payload: bytes = b"") -> bytes:
+    """Prefix a payload with the binary envelope header"""
+    timestamp_us = time.monotonic_ns() // 1000
+    return HEADER.pack(
+        PROTOCOL_VERSION, message_type, sequence & _SEQUENCE_MASK, timestamp_us
+    ) + payload
+
+
+def encode_event(event_type: str, sequence: int, payload: Dict[str, Any]) -> bytes:
+    """Encode a control event; the type lives in the header, not the body"""
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return encode_frame(EVENT_TYPES[event_type], sequence, body)
+
+
+def decode_frame(frame: bytes) -> Tuple[int, int, int, bytes]:
+    """Split a binary frame into (type, sequence, timestamp_us, payload)"""
+    if len(frame) < HEADER_SIZE:
+        raise ProtocolError("Frame shorter than header")
+    version, message_type, sequence, timestamp_us = HEADER.unpack_from(frame)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported protocol version {version}")
+    return message_type, sequence, timestamp_us, frame[HEADER_SIZE:]
+
+
+class JsonWire:
+    """Original protocol: raw audio frames plus JSON control messages"""
+
+    name = "json"
+    header_size = 0
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+
+    def is_control(self, data: bytes) -> bool:
+        return False
+
+    async def send_audio(self, data: bytes):
+        await self.websocket.send_bytes(data)
+
+    async def send_event(self, event_type: str, payload: Dict[str, Any]):
+        await self.websocket.send_json({"type": event_type, **payload})
+
+    def decode_bytes(self, data: bytes) -> Tuple[str, Any]:
+        return "audio", data
+
+
+class BinaryWire:
+    """Versioned binary envelope carrying sequence numbers and timestamps"""
+
+    name = "binary"
+    header_size = HEADER_SIZE
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.sequence = 0
+
+    def is_control(self, data: bytes) -> bool:
+        """Peek at the header to tell control frames from audio without decoding"""
+        return len(data) > 1 and data[1] in CLIENT_EVENT_NAMES
+
+    def _next_sequence(self) -> int:
+        sequence = self.sequence
+        self.sequence = (sequence + 1) & _SEQUENCE_MASK
+        return sequence
+
+    async def send_audio(self, data: bytes):
+        await self.websocket.send_bytes(
+            encode_frame(MSG_AUDIO, self._next_sequence(), data)
+        )
+
+    async def send_event(self, event_type: str, payload: Dict[str, Any]):
+        await self.websocket.send_bytes(
+            encode_event(event_type, self._next_sequence(), payload)
+        )
+
+    def decode_bytes(self, data: bytes) -> Tuple[str, Any]:
+        message_type, _, _, payload = decode_frame(data)
+        if message_type == MSG_CLIENT_AUDIO:
+            return "audio", payload
+        if message_type in CLIENT_EVENT_NAMES:
+            body = json.loads(payload) if payload else {}
+            return "event", {"type": CLIENT_EVENT_NAMES[message_type], **body}
+        raise ProtocolError(f"Unknown message type {message_type:#x}")
+
+
+def create_wire(websocket: WebSocket, subprotocol: Optional[str]):
+    """Pick the wire implementation for a negotiated subprotocol"""
+    if subprotocol == BINARY_SUBPROTOCOL:
+        return BinaryWire(websocket)
+    return JsonWire(websocket)
@@ -0,0 +1,156 @@
+import time
+from typing import Dict, Optional
+
+# Violations returned by ConnectionLimiter checks
+PAYLOAD_TOO_LARGE = "payload_too_large"
+RATE_LIMITED = "rate_limited"
+INVALID_AUDIO = "invalid_audio"
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, up to ``burst`` banked"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def consume(self, amount: float, now: float) -> bool:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+
+class _ClientBuckets:
+    __slots__ = ("messages", "audio_bytes", "connections", "last_seen")
+
+    def __init__(self, messages: TokenBucket, audio_bytes: TokenBucket):
+        self.messages = messages
+        self.audio_bytes = audio_bytes
+        self.connections = 0
+        self.last_seen = time.monotonic()
+
+
+class ConnectionLimiter:
+    """Ingest checks for one /voice connection.
+
+    Every inbound frame costs one message token from both the connection's
+    and the client IP's bucket; audio frames also cost their size in bytes.
+    Checks only look at frame sizes, so they run before any decoding.
+    """
+
+    def __init__(self, limits: "RateLimits", client: _ClientBuckets, ip: str):
+        self.limits = limits
+        self.client = client
+        self.ip = ip
+        self.messages = TokenBucket(limits.messages_per_second, limits.messages_per_second * limits.burst_seconds)
+        self.audio_bytes = TokenBucket(limits.audio_bytes_per_second, limits.audio_bytes_per_second * limits.burst_seconds)
+        # Non-PCM16 frames dropped so far; they still cost a message token
+        self.invalid_audio_frames = 0
+
+    def _take_message(self, now: float) -> Optional[str]:
+        if not (self.messages.consume(1, now) and self.client.messages.consume(1, now)):
+            return RATE_LIMITED
+        return None
+
+    def check_audio(self, size: int) -> Optional[str]:
+        """Check an audio frame of ``size`` PCM16 bytes"""
+        if size > self.limits.max_audio_frame_bytes:
+            return PAYLOAD_TOO_LARGE
+        now = time.monotonic()
+        violation = self._take_message(now)
+        if violation:
+            return violation
+        if size % 2:
+            # PCM16 frames always hold whole samples
+            self.invalid_audio_frames += 1
+            return INVALID_AUDIO
+        if size and not (
+            self.audio_bytes.consume(size, now)
+            and self.client.audio_bytes.consume(size, now)
+        ):
+            return RATE_LIMITED
+        return None
+
+    def check_text(self, size: int) -> Optional[str]:
+        """Check a control/text frame of ``size`` bytes"""
+        if size > self.limits.max_text_payload_bytes:
+            return PAYLOAD_TOO_LARGE
+        return self._take_message(time.monotonic())
+
+
+class RateLimits:
+    """Ingest limits for /voice, with buckets shared per client IP"""
+
+    def __init__(
+        self,
+        audio_bytes_per_second: float,
+        messages_per_second: float,
+        ip_audio_bytes_per_second: float,
+        ip_messages_per_second: float,
+        max_audio_frame_bytes: int,
+        max_text_payload_bytes: int,
+        max_connections_per_ip: int = 5,
+        ip_idle_ttl_seconds: float = 300.0,
+        burst_seconds: float = 2.0,
+    ):
+        self.audio_bytes_per_second = audio_bytes_per_second
+        self.messages_per_second = messages_per_second
+        self.ip_audio_bytes_per_second = ip_audio_bytes_per_second
+        self.ip_messages_per_second = ip_messages_per_second
+        self.max_audio_frame_bytes = max_audio_frame_bytes
+        self.max_text_payload_bytes = max_text_payload_bytes
+        self.max_connections_per_ip = max_connections_per_ip
+        self.ip_idle_ttl_seconds = ip_idle_ttl_seconds
+        self.burst_seconds = burst_seconds
+        self.clients: Dict[str, _ClientBuckets] = {}
+        self._last_eviction = time.monotonic()
+
+    def _evict_idle_clients(self, now: float):
+        # Sweep at most once per TTL so connect stays O(1) amortized
+        if now - self._last_eviction < self.ip_idle_ttl_seconds:
+            return
+        self._last_eviction = now
+        expired = [
+            ip for ip, client in self.clients.items()
+            if client.connections <= 0 and now - client.last_seen > self.ip_idle_ttl_seconds
+        ]
+        for ip in expired:
+            del self.clients[ip]
+
+    def connect(self, ip: str) -> Optional[ConnectionLimiter]:
+        """Create the limiter for a new connection from ``ip``.
+
+        Returns None when ``ip`` already has max_connections_per_ip open.
+        """
+        now = time.monotonic()
+        self._evict_idle_clients(now)
+        client = self.clients.get(ip)
+        if client is None:
+            client = _ClientBuckets(
+                TokenBucket(self.ip_messages_per_second, self.ip_messages_per_second * self.burst_seconds),
+                TokenBucket(self.ip_audio_bytes_per_second, self.ip_audio_bytes_per_second * self.burst_seconds),
+            )
+            self.clients[ip] = client
+        client.last_seen = now
+        if self.max_connections_per_ip and client.connections >= self.max_connections_per_ip:
+            return None
+        client.connections += 1
+        return ConnectionLimiter(self, client, ip)
+
+    def disconnect(self, limiter: ConnectionLimiter):
+        """Release a connection.
+
+        IP buckets outlive the connection (until idle for ip_idle_ttl_seconds)
+        so reconnecting does not refill the burst allowance.
+        """
+        limiter.client.connections -= 1
+        limiter.client.last_seen = time.monotonic()
@@ -0,0 +1,183 @@
+import json
+import logging
+import mmap
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Directory to write call recordings to; recording is off when unset
+RECORDING_DIR_ENV = "CALL_RECORDING_DIR"
+
+EVENTS_FILE = "events.jsonl"
+INBOUND_PCM_FILE = "inbound.pcm"
+OUTBOUND_PCM_FILE = "outbound.pcm"
+
+# Event sources
+SRC_CLIENT = "client"
+SRC_UPSTREAM = "upstream"
+SRC_GEMINI = "gemini"
+
+
+class CallRecorder:
+    """Append-only capture of a single call.
+
+    Inbound and outbound PCM go to raw files so they can be memory-mapped on
+    replay; every other event is one compact JSON line carrying its arrival
+    time (seconds since the call started) and, for audio, an offset/length
+    into the matching PCM file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.started_at = time.monotonic()
+        self.events = open(os.path.join(path, EVENTS_FILE), "w", encoding="utf-8")
+        self.inbound = open(os.path.join(path, INBOUND_PCM_FILE), "wb")
+        self.outbound = open(os.path.join(path, OUTBOUND_PCM_FILE), "wb")
+        self.inbound_offset = 0
+        self.outbound_offset = 0
+
+    def _write(self, src: str, kind: str, **fields: Any):
+        record = {"t": round(time.monotonic() - self.started_at, 6), "src": src, "kind": kind}
+        record.update(fields)
+        self.events.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def client_audio(self, data: bytes):
+        self.inbound.write(data)
+        self._write(SRC_CLIENT, "audio", off=self.inbound_offset, len=len(data))
+        self.inbound_offset += len(data)
+
+    def client_event(self, payload: Dict[str, Any]):
+        self._write(SRC_CLIENT, "event", payload=payload)
+
+    def upstream_turn(self, reason: str):
+        """Record that the server ended a turn towards Gemini"""
+        self._write(SRC_UPSTREAM, "turn_end", reason=reason)
+
+    def gemini_response(self, response: Any):
+        if response.setup_complete:
+            self._write(SRC_GEMINI, "setup_complete")
+        if response.tool_call and response.tool_call.function_calls:
+            calls = [
+                {"id": call.id, "name": call.name, "args": dict(call.args or {})}
+                for call in response.tool_call.function_calls
+            ]
+            self._write(SRC_GEMINI, "tool_call", calls=calls)
+        data = response.data
+        if data:
+            self.outbound.write(data)
+            self._write(SRC_GEMINI, "audio", off=self.outbound_offset, len=len(data))
+            self.outbound_offset += len(data)
+        server_content = response.server_content
+        if server_content and server_content.model_turn and server_content.model_turn.parts:
+            texts = [
+                part.text
+                for part in server_content.model_turn.parts
+                if part.text and not part.thought
+            ]
+            if texts:
+                self._write(SRC_GEMINI, "text", text=" ".join(texts))
+        if server_content and server_content.turn_complete:
+            self._write(SRC_GEMINI, "turn_complete")
+
+    def close(self):
+        for f in (self.events, self.inbound, self.outbound):
+            f.close()
+
+
+def open_recorder(session_id: str) -> Optional[CallRecorder]:
+    """Start recording a call if CALL_RECORDING_DIR is set"""
+    base_dir = os.getenv(RECORDING_DIR_ENV)
+    if not base_dir:
+        return None
+    path = os.path.join(base_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{session_id}")
+    try:
+        recorder = CallRecorder(path)
+    except OSError as e:
+        logger.warning(f"Call recording disabled for {session_id}: {e}")
+        return None
+    logger.info(f"Recording {session_id} to {path}")
+    return recorder
+
+
+class Recording:
+    """Read-only view of a recorded call with memory-mapped audio"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, EVENTS_FILE), encoding="utf-8") as f:
+            self.events: List[Dict[str, Any]] = [json.loads(line) for line in f if line.strip()]
+        self._files = []
+        self.inbound = self._map(INBOUND_PCM_FILE)
+        self.outbound = self._map(OUTBOUND_PCM_FILE)
+
+    def _map(self, name: str):
+        f = open(os.path.join(self.path, name), "rb")
+        self._files.append(f)
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def audio(self, event: Dict[str, Any]) -> bytes:
+        """Return the PCM bytes referenced by an audio event"""
+        source = self.inbound if event["src"] == SRC_CLIENT else self.outbound
+        return source[event["off"]:event["off"] + event["len"]]
+
+    def close(self):
+        for mapped in (self.inbound, self.outbound):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+        for f in self._files:
+            f.close()
+
+
+def load_recording(path: str) -> Recording:
+    """Open a recording directory written by CallRecorder"""
+    return Recording(path)
+
+
+def reply_groups(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Split recorded Gemini events into the replies that made up the call.
+
+    A reply starts with the first Gemini event after a ``turn_complete`` or
+    after the server ended a turn upstream. Each reply records what had
+    reached Gemini when it started: ``turns`` (upstream turn ends) and
+    ``in_off`` (inbound audio bytes). ``trigger`` is ``"turn"`` when a turn
+    end preceded it and ``"audio"`` when Gemini's voice activity detection
+    closed a spoken turn. Events carry a ``delay`` from whichever of the last
+    turn end and last inbound frame came later, so replies are paced like
+    the original call.
+    """
+    groups: List[Dict[str, Any]] = []
+    turns = 0
+    in_off = 0
+    last_turn_t = last_audio_t = 0.0
+    turn_since_reply = False
+    current: Optional[Dict[str, Any]] = None
+    for event in events:
+        src, kind = event["src"], event["kind"]
+        if src == SRC_CLIENT and kind == "audio":
+            in_off = event["off"] + event["len"]
+            last_audio_t = event["t"]
+        elif src == SRC_UPSTREAM and kind == "turn_end":
+            turns += 1
+            last_turn_t = event["t"]
+            turn_since_reply = True
+            current = None
+        elif src == SRC_GEMINI and kind != "setup_complete":
+            if current is None:
+                current = {
+                    "turns": turns,
+                    "in_off": in_off,
+                    "trigger": "turn" if turn_since_reply else "audio",
+                    "trigger_t": max(last_turn_t, last_audio_t),
+                    "events": [],
+                }
+                groups.append(current)
+                turn_since_reply = False
+            current["events"].append({**event, "delay": event["t"] - current["trigger_t"]})
+            if kind == "turn_complete":
+                current = None
+    return groups
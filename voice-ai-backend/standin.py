@@ -0,0 +1,124 @@
+import asyncio
+import contextlib
+import logging
+from typing import Any, Dict, List
+
+from google.genai import types
+
+from recording import load_recording, reply_groups
+
+logger = logging.getLogger(__name__)
+
+# Point at a recording directory to serve /voice without calling Gemini
+STANDIN_RECORDING_ENV = "GEMINI_STANDIN_RECORDING"
+
+
+class ReplaySession:
+    """Mimics the parts of the genai live session that main.py uses.
+
+    Each recorded reply starts once the server has ended as many turns and
+    forwarded as many inbound audio bytes as when the reply started in the
+    original call, so spoken turns closed by Gemini's voice activity
+    detection replay in step with the caller's audio.
+    """
+
+    def __init__(self, recording, groups: List[Dict[str, Any]]):
+        self.recording = recording
+        self.groups = groups
+        self.turns = 0
+        self.inbound_bytes = 0
+        self.progress = asyncio.Event()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.tasks = set()
+
+    def _to_message(self, event: Dict[str, Any]) -> types.LiveServerMessage:
+        kind = event["kind"]
+        if kind == "audio":
+            part = types.Part(
+                inline_data=types.Blob(
+                    mime_type="audio/pcm;rate=24000",
+                    data=bytes(self.recording.audio(event)),
+                )
+            )
+            return types.LiveServerMessage(
+                server_content=types.LiveServerContent(model_turn=types.Content(parts=[part]))
+            )
+        if kind == "text":
+            part = types.Part(text=event["text"])
+            return types.LiveServerMessage(
+                server_content=types.LiveServerContent(model_turn=types.Content(parts=[part]))
+            )
+        if kind == "tool_call":
+            calls = [types.FunctionCall(**call) for call in event["calls"]]
+            return types.LiveServerMessage(
+                tool_call=types.LiveServerToolCall(function_calls=calls)
+            )
+        return types.LiveServerMessage(
+            server_content=types.LiveServerContent(turn_complete=True)
+        )
+
+    def _reached(self, group: Dict[str, Any]) -> bool:
+        return self.turns >= group["turns"] and self.inbound_bytes >= group["in_off"]
+
+    async def play(self):
+        """Play every reply group in order as the live call catches up to it"""
+        loop = asyncio.get_running_loop()
+        for group in self.groups:
+            while not self._reached(group):
+                self.progress.clear()
+                await self.progress.wait()
+            started = loop.time()
+            for event in group["events"]:
+                await asyncio.sleep(max(0.0, started + event["delay"] - loop.time()))
+                await self.queue.put(self._to_message(event))
+        logger.info("Stand-in recording has no more replies")
+
+    def start(self):
+        task = asyncio.create_task(self.play())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def send(self, input=None, end_of_turn: bool = False):
+        if isinstance(input, types.LiveClientRealtimeInput) and input.media_chunks:
+            self.inbound_bytes += sum(len(chunk.data or b"") for chunk in input.media_chunks)
+        if (
+            end_of_turn
+            or isinstance(input, types.LiveClientToolResponse)
+            or (isinstance(input, types.LiveClientContent) and input.turn_complete)
+        ):
+            self.turns += 1
+        self.progress.set()
+
+    async def receive(self):
+        while True:
+            yield await self.queue.get()
+
+
+class _ReplayLive:
+    def __init__(self, path: str):
+        self.path = path
+
+    @contextlib.asynccontextmanager
+    async def connect(self, model: str, config: Any):
+        recording = load_recording(self.path)
+        session = ReplaySession(recording, reply_groups(recording.events))
+        await session.queue.put(types.LiveServerMessage(setup_complete=types.LiveServerSetupComplete()))
+        session.start()
+        try:
+            yield session
+        finally:
+            for task in list(session.tasks):
+                task.cancel()
+            recording.close()
+
+
+class _ReplayAio:
+    def __init__(self, path: str):
+        self.live = _ReplayLive(path)
+
+
+class ReplayLiveClient:
+    """Local stand-in for genai.Client that replays a recorded call's Gemini side"""
+
+    def __init__(self, path: str):
+        self.aio = _ReplayAio(path)
@@ -1,4 +1,5 @@
-from typing import List, Dict, Any
+from itertools import groupby
+from typing import List, Dict, Any, Optional
 import logging
 from google.genai import types
 from mock_db import (
@@ -7,8 +8,11 @@ from mock_db import (
     is_slot_available,
     book_appointment_in_db,
     cancel_appointment_in_db,
+    get_free_slots,
+    get_patient_appointments,
     DOCTORS,
 )
+from utils import summarize_items, tool_response_max_items
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +23,7 @@ def list_doctors() -> Dict[str, Any]:
         return {
             "status": "success",
             "doctors": doctors,
-            "message": f"Available doctors: {', '.join(doctors)}"
+            "message": f"Available doctors: {summarize_items(doctors)}"
         }
     except Exception as e:
         logger.error(f"Error listing doctors: {e}")
@@ -28,47 +32,59 @@ def list_doctors() -> Dict[str, Any]:
             "message": "Sorry, I couldn't retrieve the doctor list right now."
         }
 
-def get_available_slots(doctor_name: str) -> Dict[str, Any]:
-    """Tool to get available slots for a specific doctor"""
+def _describe_slots(slots: List[Dict]) -> str:
+    """Speak every slot, or one entry per day when several days are too many to list"""
+    max_items = tool_response_max_items()
+    if not max_items or len(slots) <= max_items:
+        return ", ".join(f"{slot['date']} at {slot['time']}" for slot in slots)
+    days = [
+        (day, [slot["time"] for slot in day_slots])
+        for day, day_slots in groupby(slots, key=lambda slot: slot["date"])
+    ]
+    if len(days) == 1:
+        day, times = days[0]
+        return f"{day} at {', '.join(times)}"
+    summary = ", ".join(
+        f"{day} ({len(times)} slots, {times[0]} to {times[-1]})" for day, times in days
+    )
+    return f"{summary}. Ask about a specific date to hear the exact times"
+
+def get_available_slots(
+    doctor_name: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Tool to get available slots for a specific doctor, optionally within a date range"""
     try:
         doctor = get_doctor_by_name(doctor_name)
         if not doctor:
             return {
                 "status": "error",
-                "message": f"I couldn't find a doctor named {doctor_name}. Available doctors are: {', '.join(get_all_doctors())}"
+                "message": f"I couldn't find a doctor named {doctor_name}. Available doctors are: {summarize_items(get_all_doctors())}"
             }
         
         # Filter out booked slots
-        from mock_db import APPOINTMENTS
-        available_slots = []
-        for slot in doctor["available_slots"]:
-            is_booked = any(
-                appt["doctor_id"] == doctor["doctor_id"] and
-                appt["date"] == slot["date"] and
-                appt["time"] == slot["time"]
-                for appt in APPOINTMENTS
-            )
-            if not is_booked:
-                available_slots.append(slot)
+        available_slots = get_free_slots(doctor["doctor_id"], start_date, end_date)
         
         if not available_slots:
+            if start_date or end_date:
+                return {
+                    "status": "success",
+                    "slots": [],
+                    "message": f"Dr. {doctor['name']} has no available slots in that date range."
+                }
             return {
                 "status": "success",
                 "slots": [],
                 "message": f"Dr. {doctor['name']} has no available slots at the moment."
             }
         
-        # Format slots for natural speech
-        slot_descriptions = []
-        for slot in available_slots:
-            slot_descriptions.append(f"{slot['date']} at {slot['time']}")
-        
         return {
             "status": "success",
             "doctor": doctor["name"],
             "specialty": doctor["specialty"],
             "slots": available_slots,
-            "message": f"Dr. {doctor['name']} ({doctor['specialty']}) is available on: {', '.join(slot_descriptions)}"
+            "message": f"Dr. {doctor['name']} ({doctor['specialty']}) is available on: {_describe_slots(available_slots)}"
         }
     except Exception as e:
         logger.error(f"Error getting available slots: {e}")
@@ -84,7 +100,7 @@ def book_appointment(doctor_name: str, date: str, time: str, patient_name: str =
         if not doctor:
             return {
                 "status": "error",
-                "message": f"I couldn't find a doctor named {doctor_name}. Available doctors are: {', '.join(get_all_doctors())}"
+                "message": f"I couldn't find a doctor named {doctor_name}. Available doctors are: {summarize_items(get_all_doctors())}"
             }
         
         # Check if slot is available
@@ -157,6 +173,33 @@ def cancel_appointment(doctor_name: str, date: str, time: str, patient_name: str
             "message": "Sorry, I couldn't cancel the appointment right now. Please try again."
         }
 
+def list_patient_appointments(patient_name: str) -> Dict[str, Any]:
+    """Tool to list a patient's booked appointments"""
+    try:
+        appointments = get_patient_appointments(patient_name)
+        if not appointments:
+            return {
+                "status": "not_found",
+                "appointments": [],
+                "message": f"I couldn't find any appointments booked under {patient_name}."
+            }
+        
+        descriptions = [
+            f"{appt['doctor_name']} on {appt['date']} at {appt['time']}"
+            for appt in appointments
+        ]
+        return {
+            "status": "success",
+            "appointments": appointments,
+            "message": f"{patient_name} has {len(appointments)} appointment(s): {summarize_items(descriptions)}."
+        }
+    except Exception as e:
+        logger.error(f"Error listing patient appointments: {e}")
+        return {
+            "status": "error",
+            "message": "Sorry, I couldn't look up your appointments right now."
+        }
+
 def _schema_string(description: str) -> types.Schema:
     return types.Schema(type="string", description=description)
 
@@ -175,7 +218,14 @@ FUNCTION_DECLARATIONS = [
             properties={
                 "doctor_name": _schema_string(
                     "The name of the doctor to check availability for."
-                )
+                ),
+                "start_date": _schema_string(
+                    "Optional first date to include, in YYYY-MM-DD format. "
+                    "Use the same value as end_date for a single day."
+                ),
+                "end_date": _schema_string(
+                    "Optional last date to include, in YYYY-MM-DD format."
+                ),
             },
             required=["doctor_name"],
         ),
@@ -220,6 +270,19 @@ FUNCTION_DECLARATIONS = [
             required=["doctor_name", "date", "time"],
         ),
     ),
+    types.FunctionDeclaration(
+        name="list_patient_appointments",
+        description="List the appointments currently booked under a patient's name.",
+        parameters=types.Schema(
+            type="object",
+            properties={
+                "patient_name": _schema_string(
+                    "The patient name the appointments were booked under."
+                ),
+            },
+            required=["patient_name"],
+        ),
+    ),
     types.FunctionDeclaration(
         name="end_call",
         description="Politely close the current call once the user has finished.",
@@ -238,5 +301,6 @@ TOOL_FUNCTIONS = {
     "get_available_slots": get_available_slots,
     "book_appointment": book_appointment,
     "cancel_appointment": cancel_appointment,
+    "list_patient_appointments": list_patient_appointments,
     "end_call": lambda: {"status": "success", "message": "Call ended"},
 }
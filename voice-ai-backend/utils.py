@@ -1,8 +1,9 @@
 import logging
 import json
 import base64
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import asyncio
+import os
 
 from mock_db import get_all_doctors
 
@@ -33,6 +34,31 @@ def format_tool_response(tool_name: str, result: Dict[str, Any]) -> str:
     else:
         return result.get("message", f"Sorry, there was an error with {tool_name}.")
 
+def tool_response_max_items() -> int:
+    """Longest list read out in a tool's spoken summary (0 = no cap)"""
+    return int(os.getenv("TOOL_RESPONSE_MAX_ITEMS", 12))
+
+def summarize_items(items: List[str], max_items: Optional[int] = None) -> str:
+    """Join items for speech, naming the first ``max_items`` and counting the rest.
+
+    ``max_items`` defaults to TOOL_RESPONSE_MAX_ITEMS; 0 means no cap.
+    """
+    if max_items is None:
+        max_items = tool_response_max_items()
+    if max_items and len(items) > max_items:
+        return f"{', '.join(items[:max_items])} and {len(items) - max_items} more"
+    return ", ".join(items)
+
+def compact_tool_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Trim a tool result before it is added to the live session context.
+
+    Only the ``message`` field is dropped, because it is already sent to the
+    model as the spoken summary. Data lists are kept whole since the model
+    needs them to answer the current question; older results are dropped by
+    the sliding context window instead.
+    """
+    return {key: value for key, value in result.items() if key != "message"}
+
 def _format_doctor_list() -> str:
     """Return formatted bullet list of all doctors."""
     return "\n".join(f"- {doctor}" for doctor in get_all_doctors())
@@ -53,6 +79,8 @@ Key Guidelines:
 6. Use the available tools to check doctor availability and manage appointments
 7. If you can't find a doctor by the exact name mentioned, call `list_doctors`, suggest the closest matches, and invite the caller to clarify
 8. Always confirm appointment details after booking: doctor name, date, and time
+9. If a caller asks what they have booked, or needs details to cancel, ask for their name and call `list_patient_appointments`
+10. When a caller asks about a particular day, call `get_available_slots` with `start_date` and `end_date` set to that day to get the exact times
 
 Available doctors in our system (if a caller mentions someone outside this list, gently suggest the closest match):
 {doctor_list}
@@ -86,11 +114,19 @@ def validate_audio_format(audio_data: bytes) -> bool:
         return False
     return True
 
+def is_voiced_pcm16(audio_data: bytes, threshold: float, stride: int = 4) -> bool:
+    """Cheap speech check: mean absolute level of every ``stride``-th PCM16 sample"""
+    samples = memoryview(audio_data).cast("h")[::stride]
+    if not samples:
+        return False
+    return sum(map(abs, samples)) / len(samples) >= threshold
+
 class SessionManager:
     """Manage conversation sessions and state"""
     
     def __init__(self):
         self.sessions = {}
+        self.close_reasons: Dict[str, int] = {}
     
     def create_session(self, session_id: str) -> Dict[str, Any]:
         """Create a new session"""
@@ -98,7 +134,8 @@ class SessionManager:
             "created_at": asyncio.get_event_loop().time(),
             "last_activity": asyncio.get_event_loop().time(),
             "context": {},
-            "conversation_history": []
+            "conversation_history": [],
+            "turn_latencies": []
         }
         return self.sessions[session_id]
     
@@ -115,6 +152,39 @@ class SessionManager:
         session = self.get_session(session_id)
         session["context"].update(context)
     
+    def record_turn_latency(self, session_id: str, latency_seconds: float) -> float:
+        """Record response latency for a turn against elapsed call time"""
+        session = self.get_session(session_id)
+        elapsed = session["last_activity"] - session["created_at"]
+        session["turn_latencies"].append((elapsed, latency_seconds))
+        return elapsed
+    
+    def latency_summary(self, session_id: str) -> Dict[str, Any]:
+        """Summarize turn latency for the first and second half of a call"""
+        session = self.sessions.get(session_id)
+        if not session or not session["turn_latencies"]:
+            return {"turns": 0}
+        
+        latencies = session["turn_latencies"]
+        midpoint = max(1, len(latencies) // 2)
+        first_half = [latency for _, latency in latencies[:midpoint]]
+        second_half = [latency for _, latency in latencies[midpoint:]] or first_half
+        return {
+            "turns": len(latencies),
+            "call_duration_s": round(latencies[-1][0], 1),
+            "first_half_avg_ms": round(1000 * sum(first_half) / len(first_half), 1),
+            "second_half_avg_ms": round(1000 * sum(second_half) / len(second_half), 1),
+            "max_ms": round(1000 * max(latency for _, latency in latencies), 1),
+        }
+    
+    def end_session(self, session_id: str) -> Dict[str, Any]:
+        """Remove a session once its connection has closed"""
+        return self.sessions.pop(session_id, None)
+    
+    def record_close(self, reason: str):
+        """Count why a call was closed"""
+        self.close_reasons[reason] = self.close_reasons.get(reason, 0) + 1
+    
     def cleanup_old_sessions(self, max_age_seconds: int = 3600):
         """Clean up sessions older than max_age_seconds"""
         current_time = asyncio.get_event_loop().time()